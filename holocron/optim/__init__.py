@@ -2,7 +2,7 @@ from . import wrapper
 from .adabelief import AdaBelief
 from .adamp import AdamP
 from .adan import Adan
-from .lamb import LAMB
+from .lamb import LAMB, ZeroLAMB
 from .lars import LARS
 from .ralars import RaLars
 from .tadam import TAdam
@@ -3,12 +3,30 @@
 # This program is licensed under the Apache License 2.0.
 # See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0> for full license details.
 
-from typing import Callable, Iterable, Optional, Tuple
+import math
+from functools import partial
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import torch
+from torch import Tensor, nn
 from torch.optim.optimizer import Optimizer
 
-__all__ = ["LAMB"]
+if torch.distributed.is_available():
+    from torch.distributed.optim.zero_redundancy_optimizer import ZeroRedundancyOptimizer
+else:
+    # PyTorch can be built without distributed support, ZeroLAMB is not usable then
+    ZeroRedundancyOptimizer = Optimizer  # type: ignore[misc,assignment]
+
+try:
+    import amp_C
+    from apex.multi_tensor_apply import multi_tensor_applier
+
+    _HAS_APEX = True
+except ImportError:
+    _HAS_APEX = False
+
+__all__ = ["LAMB", "ZeroLAMB", "lamb"]
 
 
 class LAMB(Optimizer):
@@ -49,6 +67,20 @@ class LAMB(Optimizer):
         eps (float, optional): term added to the denominator to improve numerical stability (default: 1e-8)
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0)
         scale_clip (tuple, optional): the lower and upper bounds for the weight norm in local LR of LARS
+        layer_adaptation (bool, optional): whether to scale the update by the local LR. Following the paper, this
+            can be disabled in the param groups of biases and normalization layers (default: True)
+        foreach (bool, optional): whether to use the multi-tensor implementation for param groups whose params share
+            the same device and dtype (default: if all params are on GPU)
+        fused (bool, optional): whether to use the fused CUDA kernel of NVIDIA Apex for groups of contiguous GPU params.
+            The kernel does not clip the weight norm (`scale_clip` is unsupported) and does not record the local LR of
+            each param.
+        optim_dtype (torch.dtype, optional): data type of the moment estimates (default: same as the params).
+            Using `torch.bfloat16` halves the memory of the optimizer state, which is usually safe for LAMB, but
+            full precision moments are more stable.
+        init_states_eagerly (bool, optional): whether to allocate the optimizer states of all params at construction
+            rather than at their first update (default: False)
+        record_local_lr (bool, optional): whether to store the local LR of each param in its state as `local_lr`
+            for inspection, which synchronizes with the device (default: False)
     """
 
     def __init__(
@@ -59,6 +91,12 @@ class LAMB(Optimizer):
         eps: float = 1e-8,
         weight_decay: float = 0.0,
         scale_clip: Optional[Tuple[float, float]] = None,
+        layer_adaptation: bool = True,
+        foreach: Optional[bool] = None,
+        fused: bool = False,
+        optim_dtype: Optional[torch.dtype] = None,
+        init_states_eagerly: bool = False,
+        record_local_lr: bool = False,
     ) -> None:
         if lr < 0.0:
             raise ValueError(f"Invalid learning rate: {lr}")
@@ -68,12 +106,77 @@ class LAMB(Optimizer):
             raise ValueError(f"Invalid beta parameter at index 0: {betas[0]}")
         if not 0.0 <= betas[1] < 1.0:
             raise ValueError(f"Invalid beta parameter at index 1: {betas[1]}")
-        defaults = dict(lr=lr, betas=betas, eps=eps, weight_decay=weight_decay)
+        if fused and scale_clip is not None:
+            raise ValueError("fused implementation of LAMB does not clip the weight norm")
+        if fused and optim_dtype is not None:
+            raise ValueError("fused implementation of LAMB requires moment estimates in the same dtype as params")
+        if fused and not _HAS_APEX:
+            raise ImportError("fused implementation of LAMB requires NVIDIA Apex: https://github.com/NVIDIA/apex")
+        defaults = dict(lr=lr, betas=betas, eps=eps, weight_decay=weight_decay, layer_adaptation=layer_adaptation)
         super().__init__(params, defaults)
         # LARS arguments
-        self.scale_clip = scale_clip
-        if self.scale_clip is None:
-            self.scale_clip = (0.0, 10.0)
+        # The fused kernel does not clip the weight norm
+        self.scale_clip: Tuple[float, float] = (0.0, math.inf if fused else 10.0) if scale_clip is None else scale_clip
+        # Implementation selection
+        self.foreach = foreach
+        self.fused = fused
+        self.optim_dtype = optim_dtype
+        self.record_local_lr = record_local_lr
+        # Contiguous moment buffers of each param group
+        self._flat_states: Dict[int, Dict[str, Tensor]] = {}
+        # Gradient accumulators holding the fused backward hooks
+        self._grad_accs: List[Any] = []
+        # Allocate all states up front, params of groups added later are initialized lazily
+        if init_states_eagerly:
+            for group in self.param_groups:
+                for p in group["params"]:
+                    self._init_state(p)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        for group in self.param_groups:
+            group.setdefault("layer_adaptation", True)
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        super().load_state_dict(state_dict)
+        # The base optimizer casts states to the dtype of params
+        if self.optim_dtype is not None:
+            for state in self.state.values():
+                for key in ("exp_avg", "exp_avg_sq"):
+                    if key in state:
+                        state[key] = state[key].to(dtype=self.optim_dtype)
+
+    def _init_state(self, p: Tensor) -> Dict[str, Any]:
+        state = self.state[p]
+        if len(state) == 0:
+            state["step"] = 0
+            # Exponential moving average of gradient values
+            state["exp_avg"] = torch.zeros_like(p.data, dtype=self.optim_dtype)
+            # Exponential moving average of squared gradient values
+            state["exp_avg_sq"] = torch.zeros_like(p.data, dtype=self.optim_dtype)
+        return state
+
+    def _flatten_states(self, params: List[Tensor]) -> Dict[str, Tensor]:
+        """Moves the moments of the params into contiguous buffers and rebinds their states to views of them"""
+        numels = [p.numel() for p in params]
+        flat_state = {}
+        for key in ("exp_avg", "exp_avg_sq"):
+            flat_state[key] = torch.cat([self.state[p][key].reshape(-1) for p in params])
+            for p, view in zip(params, flat_state[key].split(numels)):
+                self.state[p][key] = view.view_as(p)
+        return flat_state
+
+    def _is_flattened(self, params: List[Tensor], flat_state: Dict[str, Tensor]) -> bool:
+        """Checks whether the moments of the params are still views of the contiguous buffers, in the same order"""
+        offsets = [0, *accumulate(p.numel() for p in params)]
+        return all(
+            flat.numel() == offsets[-1]
+            and all(
+                self.state[p][key]._base is flat and self.state[p][key].storage_offset() == offset
+                for p, offset in zip(params, offsets)
+            )
+            for key, flat in flat_state.items()
+        )
 
     @torch.no_grad()
     def step(self, closure: Optional[Callable[[], float]] = None) -> Optional[float]:
@@ -87,54 +190,432 @@ class LAMB(Optimizer):
             with torch.enable_grad():
                 loss = closure()
 
-        for group in self.param_groups:
+        for idx, group in enumerate(self.param_groups):
+            params_with_grad = []
+            grads = []
+            states = []
+
             for p in group["params"]:
                 if p.grad is None:
                     continue
-                grad = p.grad.data
-                if grad.is_sparse:
+                if p.grad.is_sparse:
                     raise RuntimeError(f"{self.__class__.__name__} does not support sparse gradients")
 
-                state = self.state[p]
+                state = self._init_state(p)
+                state["step"] += 1
 
-                # State initialization
-                if len(state) == 0:
-                    state["step"] = 0
-                    # Exponential moving average of gradient values
-                    state["exp_avg"] = torch.zeros_like(p.data)
-                    # Exponential moving average of squared gradient values
-                    state["exp_avg_sq"] = torch.zeros_like(p.data)
+                params_with_grad.append(p)
+                grads.append(p.grad)
+                states.append(state)
 
-                exp_avg, exp_avg_sq = state["exp_avg"], state["exp_avg_sq"]
-                beta1, beta2 = group["betas"]
+            if len(params_with_grad) == 0:
+                continue
 
-                state["step"] += 1
+            on_gpu = all(p.is_cuda for p in params_with_grad)
+            # Multi-tensor kernels, stacked norms & the fused kernel require params of the same device and dtype
+            homogeneous = all(
+                p.device == params_with_grad[0].device and p.dtype == params_with_grad[0].dtype
+                for p in params_with_grad
+            )
+            contiguous = all(t.is_contiguous() for t in (*params_with_grad, *grads)) and all(
+                state["exp_avg"].is_contiguous() and state["exp_avg_sq"].is_contiguous() for state in states
+            )
+            # The fused kernel also expects contiguous tensors, and always applies the local LR
+            use_fused = self.fused and on_gpu and homogeneous and contiguous and group["layer_adaptation"]
+            # By default, multi-tensor kernels are only used when launch overhead dominates (i.e. on GPU)
+            use_foreach = not use_fused and homogeneous and (self.foreach or (self.foreach is None and on_gpu))
 
-                # Decay the first and second moment running average coefficient
-                exp_avg.mul_(beta1).add_(grad, alpha=1 - beta1)
-                exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+            # The contiguous buffers can only be updated at once if every param has a gradient
+            flat_state = None
+            if use_foreach and len(params_with_grad) == len(group["params"]):
+                flat_state = self._flat_states.get(idx)
+                # Params or states may have changed since the buffers were built (checkpoint loading, reset, etc.)
+                if flat_state is None or not self._is_flattened(params_with_grad, flat_state):
+                    flat_state = self._flatten_states(params_with_grad)
+                    self._flat_states[idx] = flat_state
 
-                # Gradient term correction
-                update = torch.zeros_like(p.data)
-                denom = exp_avg_sq.sqrt().add_(group["eps"])
-                update.addcdiv_(exp_avg, denom)
+            beta1, beta2 = group["betas"]
+            local_lrs = _lamb(
+                params_with_grad,
+                grads,
+                [state["exp_avg"] for state in states],
+                [state["exp_avg_sq"] for state in states],
+                beta1,
+                beta2,
+                group["lr"],
+                group["weight_decay"],
+                group["eps"],
+                self.scale_clip,
+                layer_adaptation=group["layer_adaptation"],
+                foreach=use_foreach,
+                fused=use_fused,
+                flat_state=flat_state,
+            )
 
-                # Weight decay
-                if group["weight_decay"] != 0:
-                    update.add_(p.data, alpha=group["weight_decay"])
+            if self.record_local_lr:
+                for state, local_lr in zip(states, local_lrs):
+                    state["local_lr"] = float(local_lr)
 
-                # LARS
-                p_norm = p.data.pow(2).sum().sqrt()
-                update_norm = update.pow(2).sum().sqrt()
-                phi_p = p_norm.clamp(*self.scale_clip)
-                # Compute the local LR
-                if phi_p == 0 or update_norm == 0:
-                    local_lr = 1
-                else:
-                    local_lr = phi_p / update_norm
+        return loss
 
-                state["local_lr"] = local_lr
+    def register_fused_backward_hooks(self, model: nn.Module) -> None:
+        """Updates each param of the optimizer as soon as its gradient is accumulated during the backward pass,
+        and frees the gradient right after. Gradients of all params are then never stored at the same time, which
+        reduces the peak memory of training.
 
-                p.data.add_(update, alpha=-group["lr"] * local_lr)
+        >>> from holocron.optim import LAMB
+        >>> model = ...
+        >>> opt = LAMB(model.parameters(), lr=1e-3)
+        >>> opt.register_fused_backward_hooks(model)
+        >>> model(x).sum().backward()  # no need to call opt.step()
 
-        return loss
+        Operations requiring all gradients at once (gradient clipping by global norm, gradient accumulation, AMP
+        gradient scaling) are not compatible with this mode, and params cannot be reused after their last use in
+        the graph (e.g. shared weights).
+
+        Args:
+            model (torch.nn.Module): model whose params are updated
+        """
+        # Groups are looked up by index since loading a state dict replaces them
+        group_idxs = {p: idx for idx, group in enumerate(self.param_groups) for p in group["params"]}
+        for p in model.parameters():
+            if p not in group_idxs or not p.requires_grad:
+                continue
+            # Hooks on the gradient accumulator are called once the gradient has been accumulated into p.grad
+            with torch.enable_grad():
+                grad_acc = p.expand_as(p).grad_fn.next_functions[0][0]
+            grad_acc.register_hook(partial(self._per_param_step, p, group_idxs[p]))
+            # The accumulator needs to stay alive for the hook to be kept
+            self._grad_accs.append(grad_acc)
+
+    @torch.no_grad()
+    def _per_param_step(self, p: Tensor, group_idx: int, *args: Any) -> None:
+        if p.grad is None:
+            return
+        group = self.param_groups[group_idx]
+        if p.grad.is_sparse:
+            raise RuntimeError(f"{self.__class__.__name__} does not support sparse gradients")
+        state = self._init_state(p)
+        state["step"] += 1
+        beta1, beta2 = group["betas"]
+        local_lrs = _lamb(
+            [p],
+            [p.grad],
+            [state["exp_avg"]],
+            [state["exp_avg_sq"]],
+            beta1,
+            beta2,
+            group["lr"],
+            group["weight_decay"],
+            group["eps"],
+            self.scale_clip,
+            layer_adaptation=group["layer_adaptation"],
+        )
+        if self.record_local_lr and len(local_lrs) > 0:
+            state["local_lr"] = float(local_lrs[0])
+        p.grad = None
+
+
+class ZeroLAMB(ZeroRedundancyOptimizer):
+    r"""Implements the :class:`~holocron.optim.LAMB` optimizer with its states sharded across the ranks of a
+    distributed process group, following `"ZeRO: Memory Optimizations Toward Training Trillion Parameter Models"
+    <https://arxiv.org/pdf/1910.02054.pdf>`_.
+
+    Each rank only holds the moment estimates of its partition of the params and updates it, before the updated
+    params are synchronized across ranks. The memory of the optimizer state per device is thus divided by the
+    world size.
+
+    >>> import torch.distributed as dist
+    >>> from holocron.optim import ZeroLAMB
+    >>> dist.init_process_group(...)
+    >>> model = ...
+    >>> opt = ZeroLAMB(model.parameters(), lr=1e-3)
+
+    Args:
+        params (iterable): iterable of parameters to optimize
+        lr (float, optional): learning rate
+        betas (Tuple[float, float], optional): beta coefficients used for running averages (default: (0.9, 0.999))
+        eps (float, optional): term added to the denominator to improve numerical stability (default: 1e-8)
+        weight_decay (float, optional): weight decay (L2 penalty) (default: 0)
+        scale_clip (tuple, optional): the lower and upper bounds for the weight norm in local LR of LARS
+        kwargs: other keyword arguments of :class:`~holocron.optim.LAMB` and
+            :class:`torch.distributed.optim.ZeroRedundancyOptimizer`, e.g. the process group to use
+    """
+
+    def __init__(
+        self,
+        params: Iterable[torch.nn.Parameter],
+        lr: float = 1e-3,
+        betas: Tuple[float, float] = (0.9, 0.999),
+        eps: float = 1e-8,
+        weight_decay: float = 0.0,
+        scale_clip: Optional[Tuple[float, float]] = None,
+        **kwargs: Any,
+    ) -> None:
+        if not torch.distributed.is_available():
+            raise ImportError("ZeroLAMB requires PyTorch to be built with distributed support")
+        super().__init__(
+            params,
+            LAMB,
+            lr=lr,
+            betas=betas,
+            eps=eps,
+            weight_decay=weight_decay,
+            scale_clip=scale_clip,
+            **kwargs,
+        )
+
+
+def lamb(
+    params: List[Tensor],
+    grads: List[Tensor],
+    exp_avgs: List[Tensor],
+    exp_avg_sqs: List[Tensor],
+    beta1: float,
+    beta2: float,
+    lr: float,
+    weight_decay: float,
+    eps: float,
+    scale_clip: Tuple[float, float],
+    *,
+    layer_adaptation: bool = True,
+    foreach: bool = False,
+    fused: bool = False,
+) -> List[Tensor]:
+    r"""Functional API that performs LAMB algorithm computation and returns the local LR of each param
+    (empty if layer adaptation is disabled).
+    See :class:`~holocron.optim.LAMB` for details.
+    """
+
+    if fused:
+        if not layer_adaptation:
+            raise ValueError("fused implementation of LAMB always applies layer adaptation")
+        if scale_clip[0] > 0 or scale_clip[1] < math.inf:
+            raise ValueError("fused implementation of LAMB does not clip the weight norm")
+        if not _HAS_APEX:
+            raise ImportError("fused implementation of LAMB requires NVIDIA Apex: https://github.com/NVIDIA/apex")
+        if any(not t.is_cuda for t in (*params, *grads, *exp_avgs, *exp_avg_sqs)):
+            raise ValueError("fused implementation of LAMB requires all tensors to be on GPU")
+
+    return _lamb(
+        params,
+        grads,
+        exp_avgs,
+        exp_avg_sqs,
+        beta1,
+        beta2,
+        lr,
+        weight_decay,
+        eps,
+        scale_clip,
+        layer_adaptation=layer_adaptation,
+        foreach=foreach,
+        fused=fused,
+    )
+
+
+def _lamb(
+    params: List[Tensor],
+    grads: List[Tensor],
+    exp_avgs: List[Tensor],
+    exp_avg_sqs: List[Tensor],
+    beta1: float,
+    beta2: float,
+    lr: float,
+    weight_decay: float,
+    eps: float,
+    scale_clip: Tuple[float, float],
+    *,
+    layer_adaptation: bool = True,
+    foreach: bool = False,
+    fused: bool = False,
+    flat_state: Optional[Dict[str, Tensor]] = None,
+) -> List[Tensor]:
+    if fused:
+        return _fused_lamb(params, grads, exp_avgs, exp_avg_sqs, beta1, beta2, lr, weight_decay, eps, scale_clip)
+    if foreach:
+        return _multi_tensor_lamb(
+            params,
+            grads,
+            exp_avgs,
+            exp_avg_sqs,
+            beta1,
+            beta2,
+            lr,
+            weight_decay,
+            eps,
+            scale_clip,
+            layer_adaptation,
+            flat_state,
+        )
+    return _single_tensor_lamb(
+        params, grads, exp_avgs, exp_avg_sqs, beta1, beta2, lr, weight_decay, eps, scale_clip, layer_adaptation
+    )
+
+
+def _single_tensor_lamb(
+    params: List[Tensor],
+    grads: List[Tensor],
+    exp_avgs: List[Tensor],
+    exp_avg_sqs: List[Tensor],
+    beta1: float,
+    beta2: float,
+    lr: float,
+    weight_decay: float,
+    eps: float,
+    scale_clip: Tuple[float, float],
+    layer_adaptation: bool = True,
+) -> List[Tensor]:
+    # Resolve the scalars once rather than for each parameter
+    one_minus_beta1, one_minus_beta2 = 1 - beta1, 1 - beta2
+    clip_min, clip_max = scale_clip
+
+    local_lrs: List[Tensor] = []
+    for param, grad, exp_avg, exp_avg_sq in zip(params, grads, exp_avgs, exp_avg_sqs):
+        # Moments may be stored in lower precision than the param
+        grad = grad.to(dtype=exp_avg.dtype)
+        # Decay the first and second moment running average coefficient
+        exp_avg.lerp_(grad, one_minus_beta1)
+        exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=one_minus_beta2)
+
+        # Gradient term correction
+        # The denominator buffer is reused to store the update
+        update = exp_avg_sq.sqrt().add_(eps)
+        torch.div(exp_avg, update, out=update)
+        # Moments may be stored in lower precision than the param
+        update = update.to(dtype=param.dtype)
+
+        # Weight decay
+        if weight_decay != 0:
+            update.add_(param, alpha=weight_decay)
+
+        if not layer_adaptation:
+            param.add_(update, alpha=-lr)
+            continue
+
+        # LARS
+        p_norm = torch.linalg.vector_norm(param)
+        update_norm = torch.linalg.vector_norm(update)
+        phi_p = p_norm.clamp(clip_min, clip_max)
+        # Compute the local LR on device to avoid a host-device synchronization
+        local_lr = phi_p.div(update_norm).masked_fill_((phi_p == 0) | (update_norm == 0), 1)
+
+        local_lrs.append(local_lr)
+
+        param.add_(update.mul_(local_lr), alpha=-lr)
+
+    return local_lrs
+
+
+def _multi_tensor_lamb(
+    params: List[Tensor],
+    grads: List[Tensor],
+    exp_avgs: List[Tensor],
+    exp_avg_sqs: List[Tensor],
+    beta1: float,
+    beta2: float,
+    lr: float,
+    weight_decay: float,
+    eps: float,
+    scale_clip: Tuple[float, float],
+    layer_adaptation: bool = True,
+    flat_state: Optional[Dict[str, Tensor]] = None,
+) -> List[Tensor]:
+    clip_min, clip_max = scale_clip
+
+    updates: List[Tensor]
+    if flat_state is None:
+        # Moments may be stored in lower precision than the params
+        grads = [grad.to(dtype=exp_avg.dtype) for grad, exp_avg in zip(grads, exp_avgs)]
+        # Decay the first and second moment running average coefficient
+        torch._foreach_mul_(exp_avgs, beta1)
+        torch._foreach_add_(exp_avgs, grads, alpha=1 - beta1)
+        torch._foreach_mul_(exp_avg_sqs, beta2)
+        torch._foreach_addcmul_(exp_avg_sqs, grads, grads, value=1 - beta2)
+
+        # Gradient term correction
+        denoms = torch._foreach_sqrt(exp_avg_sqs)
+        torch._foreach_add_(denoms, eps)
+        updates = torch._foreach_div(exp_avgs, denoms)
+        # Moments may be stored in lower precision than the params
+        updates = [update.to(dtype=param.dtype) for param, update in zip(params, updates)]
+    else:
+        # exp_avgs & exp_avg_sqs are views of the contiguous buffers, so each op is a single kernel
+        flat_exp_avg, flat_exp_avg_sq = flat_state["exp_avg"], flat_state["exp_avg_sq"]
+        flat_grad = torch.cat([grad.reshape(-1) for grad in grads]).to(dtype=flat_exp_avg.dtype)
+        flat_exp_avg.lerp_(flat_grad, 1 - beta1)
+        flat_exp_avg_sq.mul_(beta2).addcmul_(flat_grad, flat_grad, value=1 - beta2)
+
+        flat_update = flat_exp_avg_sq.sqrt().add_(eps)
+        torch.div(flat_exp_avg, flat_update, out=flat_update)
+        flat_update = flat_update.to(dtype=params[0].dtype)
+        updates = [
+            view.view_as(param) for param, view in zip(params, flat_update.split([param.numel() for param in params]))
+        ]
+
+    # Weight decay
+    if weight_decay != 0:
+        torch._foreach_add_(updates, params, alpha=weight_decay)
+
+    if not layer_adaptation:
+        torch._foreach_add_(params, updates, alpha=-lr)
+        return []
+
+    # LARS
+    p_norms = torch.stack(_multi_tensor_norm(params))
+    update_norms = torch.stack(_multi_tensor_norm(updates))
+    phi_p = p_norms.clamp_(clip_min, clip_max)
+    # Compute all the local LRs at once on device to avoid host-device synchronizations
+    local_lrs = phi_p.div(update_norms).masked_fill_((phi_p == 0) | (update_norms == 0), 1).unbind(0)
+
+    torch._foreach_mul_(updates, local_lrs)
+    torch._foreach_add_(params, updates, alpha=-lr)
+
+    return list(local_lrs)
+
+
+def _multi_tensor_norm(tensors: List[Tensor]) -> List[Tensor]:
+    # torch._foreach_norm is not available in the oldest supported PyTorch releases
+    if hasattr(torch, "_foreach_norm"):
+        return list(torch._foreach_norm(tensors))
+    return [torch.linalg.vector_norm(tensor) for tensor in tensors]
+
+
+def _fused_lamb(
+    params: List[Tensor],
+    grads: List[Tensor],
+    exp_avgs: List[Tensor],
+    exp_avg_sqs: List[Tensor],
+    beta1: float,
+    beta2: float,
+    lr: float,
+    weight_decay: float,
+    eps: float,
+    scale_clip: Tuple[float, float],
+) -> List[Tensor]:
+    device = params[0].device
+    overflow_buf = torch.zeros(1, dtype=torch.int, device=device)
+    # Disable the global gradient clipping of the kernel
+    grad_norm = torch.zeros(1, device=device)
+    multi_tensor_applier(
+        amp_C.multi_tensor_lamb,
+        overflow_buf,
+        [grads, params, exp_avgs, exp_avg_sqs],
+        lr,
+        beta1,
+        beta2,
+        eps,
+        # Bias correction is disabled so the step value is unused
+        1,
+        0,
+        weight_decay,
+        # Gradient averaging & decoupled weight decay
+        1,
+        1,
+        grad_norm,
+        1.0,
+        # Always apply the trust ratio
+        True,
+    )
+
+    return []
@@ -3,7 +3,7 @@
 # This program is licensed under the Apache License 2.0.
 # See LICENSE or go to <https://www.apache.org/licenses/LICENSE-2.0> for full license details.
 
-from typing import List, Optional, Tuple
+from typing import List, Optional, Set, Tuple
 
 from torch import nn
 from torch.nn.modules.batchnorm import _BatchNorm
@@ -25,10 +25,14 @@ def freeze_bn(mod: nn.Module) -> None:
 
     # Loop on modules
     for m in mod.modules():
-        if isinstance(m, _BatchNorm) and m.affine and all(not p.requires_grad for p in m.parameters()):
-            # Switch back to commented code when https://github.com/pytorch/pytorch/issues/37823 is resolved
-            m.track_running_stats = False
-            m.eval()
+        _freeze_bn(m)
+
+
+def _freeze_bn(m: nn.Module) -> None:
+    if isinstance(m, _BatchNorm) and m.affine and not any(p.requires_grad for p in m.parameters(recurse=False)):
+        # Switch back to commented code when https://github.com/pytorch/pytorch/issues/37823 is resolved
+        m.track_running_stats = False
+        m.eval()
 
 
 def freeze_model(
@@ -49,27 +53,34 @@ def freeze_model(
         frozen_bn_stat_update (bool, optional): force stats update in BN layers that are frozen
     """
 
-    # Unfreeze everything
-    for p in model.parameters():
-        p.requires_grad_(True)
-
-    # Loop on parameters
-    if isinstance(last_frozen_layer, str):
-        layer_reached = False
-        for n, p in model.named_parameters():
-            if not layer_reached or n.startswith(last_frozen_layer):
-                p.requires_grad_(False)
-            if n.startswith(last_frozen_layer):
-                layer_reached = True
-            # Once the last param of the layer is frozen, we break
-            elif layer_reached:
-                break
-        if not layer_reached:
-            raise ValueError(f"Unable to locate child module {last_frozen_layer}")
-
-    # Loop on modules
-    if not frozen_bn_stat_update:
-        freeze_bn(model)
+    # Single pass on modules: params are visited in the same order as model.named_parameters()
+    prefix = last_frozen_layer if isinstance(last_frozen_layer, str) else None
+    freeze = prefix is not None
+    layer_reached = False
+    seen: Set[nn.Parameter] = set()
+    bn_layers: List[nn.Module] = []
+    for name, module in model.named_modules():
+        for n, p in module.named_parameters(prefix=name, recurse=False):
+            # Shared params are only considered at their first occurrence
+            if p in seen:
+                continue
+            seen.add(p)
+            if prefix is not None and freeze:
+                if n.startswith(prefix):
+                    layer_reached = True
+                # Once the last param of the layer is frozen, we unfreeze the rest
+                elif layer_reached:
+                    freeze = False
+            p.requires_grad_(not freeze)
+        if not frozen_bn_stat_update and isinstance(module, _BatchNorm):
+            bn_layers.append(module)
+
+    if prefix is not None and not layer_reached:
+        raise ValueError(f"Unable to locate child module {last_frozen_layer}")
+
+    # BN layers are only switched once the cutoff is known to exist
+    for m in bn_layers:
+        _freeze_bn(m)
 
 
 def split_normalization_params(
@@ -90,10 +101,8 @@ def split_normalization_params(
     norm_params: List[nn.Parameter] = []
     other_params: List[nn.Parameter] = []
     for module in model.modules():
-        if next(module.children(), None):
-            other_params.extend(p for p in module.parameters(recurse=False) if p.requires_grad)
-        elif isinstance(module, classes):
-            norm_params.extend(p for p in module.parameters() if p.requires_grad)
-        else:
-            other_params.extend(p for p in module.parameters() if p.requires_grad)
+        # Only leaf modules can be normalization layers
+        is_norm = isinstance(module, classes) and next(module.children(), None) is None
+        target = norm_params if is_norm else other_params
+        target.extend(p for p in module.parameters(recurse=False) if p.requires_grad)
     return norm_params, other_params
@@ -1,10 +1,15 @@
+import math
+from copy import deepcopy
 from typing import Any
 
+import pytest
 import torch
+import torch.distributed as dist
 from torch.nn import functional as F
 from torchvision.models import mobilenet_v3_small
 
 from holocron import optim
+from holocron.optim.lamb import _HAS_APEX, lamb
 
 
 def _test_optimizer(name: str, **kwargs: Any) -> None:
@@ -46,6 +51,130 @@ def test_lars():
 
 def test_lamb():
     _test_optimizer("LAMB", weight_decay=2e-5)
+    _test_optimizer("LAMB", weight_decay=2e-5, foreach=True)
+    _test_optimizer("LAMB", weight_decay=2e-5, foreach=False)
+    _test_optimizer("LAMB", weight_decay=2e-5, optim_dtype=torch.bfloat16)
+    _test_optimizer("LAMB", weight_decay=2e-5, layer_adaptation=False)
+    _test_optimizer("LAMB", weight_decay=2e-5, init_states_eagerly=True)
+    _test_optimizer("LAMB", weight_decay=2e-5, record_local_lr=True)
+
+
+def test_lamb_flat_states():
+    model = torch.nn.Linear(8, 4)
+    optimizer = optim.LAMB(model.parameters(), lr=1e-3, foreach=True)
+    # The per-tensor implementation serves as reference
+    ref_model = deepcopy(model)
+    ref_optimizer = optim.LAMB(ref_model.parameters(), lr=1e-3, foreach=False)
+
+    def _step():
+        input_t = torch.rand((4, 8))
+        for _model, _optimizer in ((model, optimizer), (ref_model, ref_optimizer)):
+            _optimizer.zero_grad()
+            _model(input_t).sum().backward()
+            _optimizer.step()
+        assert all(torch.allclose(p, ref_p) for p, ref_p in zip(model.parameters(), ref_model.parameters()))
+
+    _step()
+    assert optimizer.state[model.weight]["exp_avg"]._base is not None
+    # Replace the states, the contiguous buffers need to be rebuilt
+    for state in optimizer.state.values():
+        state["exp_avg"] = state["exp_avg"].clone()
+    _step()
+    assert optimizer.state[model.weight]["exp_avg"]._base is not None
+    # Reorder the params, the contiguous buffers need to be laid out again
+    optimizer.param_groups[0]["params"].reverse()
+    _step()
+
+
+def test_lamb_optim_dtype():
+    for foreach in (False, True):
+        model = torch.nn.Linear(8, 4)
+        optimizer = optim.LAMB(model.parameters(), lr=1e-3, foreach=foreach, optim_dtype=torch.bfloat16)
+        p_val = model.weight.data.clone()
+        for _ in range(3):
+            optimizer.zero_grad()
+            model(torch.rand((4, 8))).sum().backward()
+            optimizer.step()
+        # Moments are stored in lower precision, params are not
+        for state in optimizer.state.values():
+            assert state["exp_avg"].dtype == torch.bfloat16 and state["exp_avg_sq"].dtype == torch.bfloat16
+        assert model.weight.dtype == torch.float32
+        assert not torch.equal(model.weight.data, p_val)
+    # The fused kernel does not support it
+    with pytest.raises(ValueError):
+        optim.LAMB(model.parameters(), fused=True, optim_dtype=torch.bfloat16)
+
+
+def test_lamb_legacy_state_dict():
+    model = torch.nn.Linear(8, 4)
+    optimizer = optim.LAMB(model.parameters(), lr=1e-3)
+    # State dicts saved before layer adaptation became a param group option
+    state_dict = optimizer.state_dict()
+    del state_dict["param_groups"][0]["layer_adaptation"]
+    optimizer.load_state_dict(state_dict)
+    assert optimizer.param_groups[0]["layer_adaptation"]
+    model(torch.rand((4, 8))).sum().backward()
+    optimizer.step()
+
+
+def test_lamb_init_states_eagerly():
+    model = torch.nn.Linear(8, 4)
+    # States are lazily initialized by default
+    assert len(optim.LAMB(model.parameters(), lr=1e-3).state) == 0
+    optimizer = optim.LAMB(model.parameters(), lr=1e-3, init_states_eagerly=True)
+    for p in model.parameters():
+        state = optimizer.state[p]
+        assert state["step"] == 0
+        assert state["exp_avg"].shape == p.shape and state["exp_avg_sq"].shape == p.shape
+
+
+def test_lamb_record_local_lr():
+    for foreach in (False, True):
+        for record_local_lr in (False, True):
+            model = torch.nn.Linear(8, 4)
+            optimizer = optim.LAMB(model.parameters(), lr=1e-3, foreach=foreach, record_local_lr=record_local_lr)
+            model(torch.rand((4, 8))).sum().backward()
+            optimizer.step()
+            for p in model.parameters():
+                if record_local_lr:
+                    assert isinstance(optimizer.state[p]["local_lr"], float)
+                else:
+                    assert "local_lr" not in optimizer.state[p]
+
+
+@pytest.mark.skipif(_HAS_APEX, reason="NVIDIA Apex is installed")
+def test_lamb_fused_requires_apex():
+    with pytest.raises(ImportError):
+        optim.LAMB([torch.nn.Parameter(torch.rand(4))], fused=True)
+
+
+@pytest.mark.skipif(not dist.is_available(), reason="PyTorch is built without distributed support")
+def test_zero_lamb(tmpdir):
+    # Single-process group
+    dist.init_process_group("gloo", init_method=f"file://{tmpdir.join('store')}", rank=0, world_size=1)
+    try:
+        _test_optimizer("ZeroLAMB", weight_decay=2e-5)
+
+        # Checkpoint round-trip
+        model = torch.nn.Linear(8, 4)
+        optimizer = optim.ZeroLAMB(model.parameters(), lr=1e-3, foreach=True)
+
+        def _step():
+            optimizer.zero_grad()
+            model(torch.rand((4, 8))).sum().backward()
+            optimizer.step()
+
+        _step()
+        optimizer.consolidate_state_dict()
+        state_dict = deepcopy(optimizer.state_dict())
+        _step()
+        optimizer.load_state_dict(state_dict)
+        exp_avg_val = optimizer.optim.state[model.weight]["exp_avg"].clone()
+        _step()
+        # The loaded states keep being updated
+        assert not torch.equal(optimizer.optim.state[model.weight]["exp_avg"], exp_avg_val)
+    finally:
+        dist.destroy_process_group()
 
 
 def test_ralars():
@@ -66,3 +195,63 @@ def test_adamp():
 
 def test_adan():
     _test_optimizer("Adan")
+
+
+def test_lamb_fused_backward_hooks():
+    model = torch.nn.Sequential(torch.nn.Linear(8, 4), torch.nn.ReLU(), torch.nn.Linear(4, 2))
+    optimizer = optim.LAMB(model.parameters(), lr=1e-3, weight_decay=2e-5)
+    optimizer.register_fused_backward_hooks(model)
+    p_vals = [p.data.clone() for p in model.parameters()]
+    model(torch.rand((4, 8))).sum().backward()
+    # Params are updated during the backward pass and gradients are freed
+    for p, p_val in zip(model.parameters(), p_vals):
+        assert p.grad is None
+        assert not torch.equal(p.data, p_val)
+
+    # Hooks follow the param groups of a loaded state dict
+    state_dict = optimizer.state_dict()
+    state_dict["param_groups"][0]["lr"] = 0.0
+    optimizer.load_state_dict(state_dict)
+    p_vals = [p.data.clone() for p in model.parameters()]
+    model(torch.rand((4, 8))).sum().backward()
+    assert all(torch.equal(p.data, p_val) for p, p_val in zip(model.parameters(), p_vals))
+
+
+def test_lamb_functional():
+    params = [torch.rand(4, 3), torch.rand(5), torch.zeros(2)]
+    grads = [torch.rand_like(p) for p in params]
+    outs = []
+    for foreach in (False, True):
+        _params = [p.clone() for p in params]
+        exp_avgs = [torch.zeros_like(p) for p in params]
+        exp_avg_sqs = [torch.zeros_like(p) for p in params]
+        local_lrs = lamb(
+            _params, grads, exp_avgs, exp_avg_sqs, 0.9, 0.999, 1e-3, 2e-5, 1e-8, (0.0, 10.0), foreach=foreach
+        )
+        assert len(local_lrs) == len(params)
+        # Null params fall back to a local LR of 1
+        assert local_lrs[-1].item() == 1
+        outs.append(_params)
+    # Both implementations yield the same update
+    assert all(torch.allclose(p1, p2) for p1, p2 in zip(*outs))
+    # The fused kernel has no equivalent of these options
+    with pytest.raises(ValueError):
+        lamb(params, grads, exp_avgs, exp_avg_sqs, 0.9, 0.999, 1e-3, 2e-5, 1e-8, (0.0, 10.0), fused=True)
+    with pytest.raises(ValueError):
+        lamb(
+            params,
+            grads,
+            exp_avgs,
+            exp_avg_sqs,
+            0.9,
+            0.999,
+            1e-3,
+            2e-5,
+            1e-8,
+            (0.0, math.inf),
+            layer_adaptation=False,
+            fused=True,
+        )
+    # The fused kernel requires Apex and GPU tensors
+    with pytest.raises(ValueError if _HAS_APEX else ImportError):
+        lamb(params, grads, exp_avgs, exp_avg_sqs, 0.9, 0.999, 1e-3, 2e-5, 1e-8, (0.0, math.inf), fused=True)
@@ -41,3 +41,40 @@ def test_freeze_model():
     trainer.freeze_model(mod, "0")
     # Ensure the last layer is now unfrozen
     assert all(p.requires_grad for p in mod[-1].parameters())
+
+
+def test_split_normalization_params():
+
+    mod = nn.Sequential(
+        nn.Conv2d(3, 32, 3),
+        nn.Sequential(nn.BatchNorm2d(32), nn.ReLU(inplace=True), nn.Conv2d(32, 16, 3)),
+        nn.GroupNorm(4, 16),
+    )
+    norm_params, other_params = trainer.split_normalization_params(mod)
+    # Each param is collected exactly once
+    assert len(norm_params) + len(other_params) == len(list(mod.parameters()))
+    assert {id(p) for p in norm_params} == {id(p) for p in [*mod[1][0].parameters(), *mod[2].parameters()]}
+    assert {id(p) for p in other_params} == {id(p) for p in [*mod[0].parameters(), *mod[1][2].parameters()]}
+    with pytest.raises(ValueError):
+        trainer.split_normalization_params(mod, [int])
+
+
+def test_freeze_model_bn():
+
+    mod = nn.Sequential(
+        nn.Sequential(nn.Conv2d(3, 32, 3), nn.BatchNorm2d(32), nn.ReLU(inplace=True)),
+        nn.Sequential(nn.Conv2d(32, 64, 3), nn.BatchNorm2d(64), nn.ReLU(inplace=True)),
+    ).train()
+    trainer.freeze_model(mod, "0")
+    # Frozen BN layers have their stats frozen, the others are untouched
+    assert not mod[0][1].training and not mod[0][1].track_running_stats
+    assert mod[1][1].training and mod[1][1].track_running_stats
+    # Stats update can be forced
+    mod = mod.train()
+    mod[0][1].track_running_stats = True
+    trainer.freeze_model(mod, "0", frozen_bn_stat_update=True)
+    assert mod[0][1].training and mod[0][1].track_running_stats
+    # BN layers are untouched if the cutoff is not found
+    with pytest.raises(ValueError):
+        trainer.freeze_model(mod, "wrong_layer")
+    assert all(m.training and m.track_running_stats for m in (mod[0][1], mod[1][1]))